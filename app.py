@@ -4,30 +4,364 @@ Santa AI - Interactive Gift Selection Assistant
 Powered by SignalWire and RapidAPI
 """
 
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import mimetypes
 import random
 import os
+import re
+import stat
+import tempfile
 import time
-import requests
+import threading
+import httpx
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from itertools import islice, zip_longest
+from types import MappingProxyType
 from typing import Dict, List
 from signalwire_agents import AgentBase, AgentServer
 from signalwire_agents.core.function_result import SwaigFunctionResult
 from dotenv import load_dotenv
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-worker setup lock, each worker sets up on its own
+    fcntl = None
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger("santa")
+# The SDK configures root logging (SIGNALWIRE_LOG_LEVEL); LOG_LEVEL overrides it for this app
+_log_level = os.getenv("LOG_LEVEL", "").upper()
+if isinstance(logging.getLevelName(_log_level), int):
+    logger.setLevel(_log_level)
+elif _log_level:
+    logger.warning("Ignoring unknown LOG_LEVEL %r", os.getenv("LOG_LEVEL"))
+
 HOST = os.getenv('HOST', '0.0.0.0')
 PORT = int(os.getenv('PORT', 5000))
 
-# Store the SWML handler info for reuse
+# Gift search results cache (Amazon results are effectively static over minutes)
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 600))
+SEARCH_CACHE_SIZE = 512
+
+# Upper bound on a RapidAPI search response body we are willing to decode
+MAX_SEARCH_RESPONSE_BYTES = 256 * 1024
+
+# Most wishes searched per search_gifts call (one RapidAPI request each, matching the 4 options shown)
+MAX_SEARCH_QUERIES = 4
+
+# First numeric amount in a price string (e.g. "$1,299.99" -> "1,299.99")
+_PRICE_RE = re.compile(r'(\d+(?:,\d{3})*(?:\.\d+)?)')
+
+# Santa's conversation prompts
+_PERSONALITY_PROMPT = """You are Santa Claus, speaking directly to a child who has called you at the North Pole.
+You're jolly, warm, and magical. You love to hear what children want for Christmas and help them
+choose the perfect gift. Use phrases like "Ho ho ho!", "Merry Christmas!", and refer to your
+workshop, elves, and reindeer. Keep responses cheerful but concise - remember you're having
+a phone conversation with an excited child."""
+
+_FLOW_PROMPT = """Follow these conversation states:
+
+1. GREETING: Welcome the child warmly, ask their name, and find out what they'd like for Christmas
+2. COLLECTING_WISHES: Listen to what gifts they're interested in, ask clarifying questions if needed
+3. SEARCHING_GIFTS: Let them know you're checking your workshop and Amazon's catalog
+4. PRESENTING_OPTIONS: Present up to 3 gift options enthusiastically
+5. CONFIRMING_SELECTION: Help them choose ONE gift (gently explain they can only pick one)
+6. SENDING_GIFT: Confirm you'll send the gift details to their parents
+
+Always maintain the magic of Christmas and never break character."""
+
+_SPEECH_PROMPT = """Use natural speech patterns including:
+- "Ho ho ho!" when greeting or expressing joy
+- "Let me check my list..." when searching
+- "Oh my!" when surprised
+- "Wonderful choice!" when they select something
+- "The elves will love making this!" when confirming
+
+Add natural pauses with filler words like "hmm", "let's see", "ah yes" to sound more natural."""
+
+_TOOLS_PROMPT = """You have access to these magical tools to help children:
+
+1. search_gifts - Use this when a child tells you what they want for Christmas.
+   This searches both Santa's workshop and Amazon's catalog.
+   Example: If a child says "I want Legos", use search_gifts with query="lego sets"
+   If they wish for several different things, pass them together with queries=["lego sets", "scooter"]
+
+2. select_gift - Use this after presenting options to confirm which gift they chose.
+   This records their selection and shows it on the screen.
+
+3. check_nice_list - Use this when a child asks if they're on the nice list or
+   when you want to check their behavior status. Always use their name.
+
+IMPORTANT: You MUST use these tools during the conversation!
+- When a child mentions what they want → use search_gifts
+- After they pick from options → use select_gift
+- When checking nice list → use check_nice_list"""
+
+# JSON schemas for the SWAIG tool parameters
+_SEARCH_GIFTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "description": "What to search for (e.g., 'lego sets', 'dolls', 'video games for kids')"
+        },
+        "queries": {
+            "type": "array",
+            "items": {"type": "string"},
+            "maxItems": MAX_SEARCH_QUERIES,
+            "description": "Several different things to search for at once when the child names more than one wish (optional)"
+        },
+        "child_age": {
+            "type": "integer",
+            "description": "Approximate age of the child (optional)",
+            "minimum": 3,
+            "maximum": 16
+        }
+    },
+    "required": ["query"]
+}
+
+_SELECT_GIFT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "gift_choice": {
+            "type": "integer",
+            "description": "The option number (1, 2, 3, or 4)",
+            "minimum": 1,
+            "maximum": 4
+        }
+    },
+    "required": ["gift_choice"]
+}
+
+_CHECK_NICE_LIST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {
+            "type": "string",
+            "description": "The child's name"
+        }
+    },
+    "required": ["name"]
+}
+
+# One spoken gift option in the search_gifts response
+_OPTION_TMPL = "Option {i}: {title}\n   Price: {price}\n{rating_line}{desc_line}\n"
+
+# Nice list answers for check_nice_list, formatted with the child's name
+_NICE_TEMPLATES = (
+    "Let me check my big magical book here at the North Pole... *pages rustling*... Oh yes! I found it! {name} is definitely on the NICE LIST! You've been wonderful this year!",
+    "Ho ho ho! {name}! Let me see... *checking list twice*... YES! You're on my nice list! I can see all the kind things you've done this year!",
+    "My special list says {name} has been absolutely wonderful! The elves have been telling me such good things about you! Keep up the fantastic work!",
+    "The elves are so excited! They just told me that {name} is on the nice list! They've been watching and you've been so good!"
+)
+
+# Canned gift results used when RapidAPI is unavailable
+_MOCK_PRODUCTS = MappingProxyType({
+    "lego": [
+        {
+            'title': 'LEGO Classic Creative Bricks Set',
+            'price': '$29.99',
+            'image': 'https://via.placeholder.com/300x300?text=LEGO+Set',
+            'url': '#',
+            'description': 'Build anything you can imagine with this classic LEGO set!'
+        },
+        {
+            'title': 'LEGO City Police Station',
+            'price': '$79.99',
+            'image': 'https://via.placeholder.com/300x300?text=Police+Station',
+            'url': '#',
+            'description': 'Complete police station with vehicles and minifigures'
+        },
+        {
+            'title': 'LEGO Friends Heartlake City',
+            'price': '$49.99',
+            'image': 'https://via.placeholder.com/300x300?text=LEGO+Friends',
+            'url': '#',
+            'description': 'Build and play in Heartlake City with friends'
+        }
+    ],
+    "doll": [
+        {
+            'title': 'American Girl Doll - Holiday Edition',
+            'price': '$98.00',
+            'image': 'https://via.placeholder.com/300x300?text=American+Girl',
+            'url': '#',
+            'description': 'Beautiful holiday-themed American Girl doll'
+        },
+        {
+            'title': 'Barbie Dreamhouse Playset',
+            'price': '$89.99',
+            'image': 'https://via.placeholder.com/300x300?text=Barbie+Dreamhouse',
+            'url': '#',
+            'description': 'Three-story Barbie dreamhouse with elevator'
+        },
+        {
+            'title': 'Baby Alive Doll',
+            'price': '$34.99',
+            'image': 'https://via.placeholder.com/300x300?text=Baby+Alive',
+            'url': '#',
+            'description': 'Interactive baby doll that eats, drinks, and more'
+        }
+    ]
+})
+
+def _iter_filtered(items, min_price, max_price):
+    """Yield cleaned product dicts for RapidAPI items with a title, image and in-range price"""
+    for item in items:
+        # Extract product details
+        title = item.get('product_title', '')
+        price_str = item.get('product_price', '')
+        image = item.get('product_photo', '')
+        url = item.get('product_url', '')
+        asin = item.get('asin', '')
+
+        # Skip if no title or image
+        if not title or not image:
+            continue
+
+        # Extract numeric price for filtering (e.g., "$29.99" -> 29.99)
+        # Items whose price can't be parsed (or isn't a string) are still included
+        match = _PRICE_RE.search(price_str) if isinstance(price_str, str) else None
+        price_num = float(match.group(1).replace(',', '')) if match else None
+
+        # Skip if outside price range
+        if price_num is not None and (price_num < min_price or price_num > max_price):
+            continue
+
+        yield {
+            'title': title,
+            'price': price_str or 'Price not available',
+            'image': image,
+            'url': url or f'https://www.amazon.com/dp/{asin}' if asin else '#',
+            'description': (item.get('product_description') or '')[:200] or f"{title} - Great gift for kids!",
+            'rating': item.get('product_star_rating', ''),
+            'asin': asin
+        }
+
+
+def _merge_search_results(results):
+    """Interleave per-query product lists, dropping duplicates by ASIN (or title)"""
+    merged = []
+    seen = set()
+    for group in zip_longest(*results):
+        for product in group:
+            if product is None:
+                continue
+            key = product.get('asin') or product.get('title')
+            if key not in seen:
+                seen.add(key)
+                merged.append(product)
+    return merged
+
+
+# Store the SWML handler info for reuse (written by the background setup thread)
 swml_handler_info = {"id": None, "address_id": None, "address": None}
+_handler_info_lock = threading.Lock()
+
+
+def pooled_session(max_retries=0):
+    """Create a requests.Session with a connection pool (requests is only imported on first use)."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=max_retries))
+    return session
+
+
+# Shared session for SignalWire REST calls so TCP + TLS connections are reused.
+# Transient failures and rate limits are retried with exponential backoff, honoring Retry-After.
+# POST (handler create) is not idempotent, so it only gets connect-error retries; a failed
+# create falls back to re-looking up the handler instead.
+# Only the background setup thread uses it, so it's created lazily to keep requests off the import path.
+_sw_session = None
+_sw_session_lock = threading.Lock()
+# Per-attempt timeout (seconds) for SignalWire REST calls; setup holds a cross-worker lock
+# around them, so a hung connection must not block every worker's setup indefinitely
+SW_REQUEST_TIMEOUT = 10
+
+
+def get_sw_session():
+    """Return the shared SignalWire REST session, creating it on first use."""
+    global _sw_session
+    if _sw_session is None:
+        with _sw_session_lock:
+            if _sw_session is None:
+                from urllib3.util.retry import Retry
+
+                session = pooled_session(max_retries=Retry(
+                    total=5,
+                    backoff_factor=0.3,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET", "PUT"]),
+                    respect_retry_after_header=True
+                ))
+                session.headers.update({"Accept": "application/json"})
+                _sw_session = session
+    return _sw_session
+
+
+# Guest tokens shared by web clients, keyed by address_id -> (token, expire_at).
+# A background refresh re-issues each token TOKEN_REFRESH_MARGIN seconds before it expires;
+# requests only mint a token themselves if the cached one has under TOKEN_MIN_REMAINING left.
+TOKEN_LIFETIME = 3600 * 24  # 24 hours
+TOKEN_REFRESH_MARGIN = 600
+TOKEN_MIN_REMAINING = 300
+_token_cache = {}
+_token_refreshers = {}
+# Strong references to in-flight refresh tasks (the event loop only keeps weak ones)
+_token_refresh_tasks = set()
+_token_lock = asyncio.Lock()
+# Guest token endpoint and per-address allowed_addresses lists, built once and reused
+_GUEST_TOKENS_PATH = "/api/fabric/guests/tokens"
+_GUEST_TOKENS_HEADERS = {"Content-Type": "application/json"}
+_allowed_addresses = {}
+
+# Cached listing of external SWML handlers, refreshed with a conditional GET after the TTL
+HANDLER_CACHE_TTL = 300
+HANDLER_PAGE_SIZE = 1000
+_handlers_cache = {"ts": 0, "etag": None, "handlers": None}
+
+# In-memory static assets: the small text files the page loads on every visit are read once
+# at startup. They aren't fingerprinted, so browsers cache them briefly and then revalidate
+# with their ETag. Images and media stay on the SDK's FileResponse path.
+STATIC_CACHE_SUFFIXES = (".html", ".js", ".css")
+STATIC_CACHE_MAX_FILE_BYTES = 512 * 1024
+STATIC_CACHE_MAX_AGE = 300
+
+# Cross-worker coordination for handler setup: one gunicorn worker holds the lock and
+# talks to SignalWire, later workers reuse the result it leaves in the state file.
+# Both files live in a per-user directory only this user can access (POSIX only, see fcntl).
+SWML_SETUP_DIR = os.path.join(tempfile.gettempdir(), f"santa-swml-{os.getuid()}" if fcntl else "santa-swml")
+SWML_SETUP_LOCK_FILE = os.path.join(SWML_SETUP_DIR, "setup.lock")
+SWML_SETUP_STATE_FILE = os.path.join(SWML_SETUP_DIR, "handler.json")
+SWML_SETUP_STATE_TTL = 600
 
 class SantaAIAgent(AgentBase):
     """Santa Claus - Your Christmas Gift Selection Assistant"""
 
+    # Speech hints for better recognition of holiday terms
+    _SPEECH_HINTS = (
+        "toy", "toys", "game", "games", "doll", "dolls",
+        "lego", "puzzle", "bicycle", "bike", "scooter",
+        "christmas", "present", "gift", "santa", "elves",
+        "nice", "naughty", "list", "workshop", "north pole",
+        "yes", "no", "please", "thank you",
+        "option one", "option two", "option three",
+        "first", "second", "third"
+    )
+
     def __init__(self):
         super().__init__(
             name="Santa",
@@ -39,6 +373,36 @@ class SantaAIAgent(AgentBase):
         self.rapidapi_key = os.getenv('RAPIDAPI_KEY')
         self.rapidapi_host = os.getenv('RAPIDAPI_HOST', 'real-time-amazon-data.p.rapidapi.com')
 
+        # Demo/CI mode: answer every search from the mock catalog without calling RapidAPI
+        self._offline_demo = os.getenv('OFFLINE_DEMO') == '1'
+
+        # Request pieces that never change between searches
+        # Use lowercase headers with x- prefix as shown in the curl example
+        self._rapidapi_url = f'https://{self.rapidapi_host}/search'
+        self._rapidapi_headers = {
+            'x-rapidapi-host': self.rapidapi_host,
+            'x-rapidapi-key': self.rapidapi_key
+        }
+        # Match the exact query parameters from the curl example
+        self._rapidapi_base_params = {
+            'page': '1',
+            'country': 'US',
+            'sort_by': 'RELEVANCE',
+            'product_condition': 'ALL',
+            'is_prime': 'false',
+            'deals_and_discounts': 'NONE'
+        }
+
+        # Persistent HTTP session so RapidAPI connections (TCP + TLS) are reused across searches,
+        # created on the first live search
+        self._http = None
+        self._http_error = None
+        self._http_lock = threading.Lock()
+
+        # Recent search results keyed by normalized query -> (expires_at, products)
+        self._search_cache = {}
+        self._cache_lock = threading.Lock()
+
         # Gift price limits
         self.min_price = float(os.getenv('MIN_GIFT_PRICE', '10.00'))
         self.max_price = float(os.getenv('MAX_GIFT_PRICE', '100.00'))
@@ -56,63 +420,16 @@ class SantaAIAgent(AgentBase):
         """Initialize Santa's personality and conversation prompts"""
 
         # Santa's personality
-        self.prompt_add_section(
-            "Personality",
-            """You are Santa Claus, speaking directly to a child who has called you at the North Pole.
-            You're jolly, warm, and magical. You love to hear what children want for Christmas and help them
-            choose the perfect gift. Use phrases like "Ho ho ho!", "Merry Christmas!", and refer to your
-            workshop, elves, and reindeer. Keep responses cheerful but concise - remember you're having
-            a phone conversation with an excited child."""
-        )
+        self.prompt_add_section("Personality", _PERSONALITY_PROMPT)
 
         # Conversation states
-        self.prompt_add_section(
-            "Conversation Flow",
-            """Follow these conversation states:
-
-            1. GREETING: Welcome the child warmly, ask their name, and find out what they'd like for Christmas
-            2. COLLECTING_WISHES: Listen to what gifts they're interested in, ask clarifying questions if needed
-            3. SEARCHING_GIFTS: Let them know you're checking your workshop and Amazon's catalog
-            4. PRESENTING_OPTIONS: Present up to 3 gift options enthusiastically
-            5. CONFIRMING_SELECTION: Help them choose ONE gift (gently explain they can only pick one)
-            6. SENDING_GIFT: Confirm you'll send the gift details to their parents
-
-            Always maintain the magic of Christmas and never break character."""
-        )
+        self.prompt_add_section("Conversation Flow", _FLOW_PROMPT)
 
         # Natural filler words for realistic speech
-        self.prompt_add_section(
-            "Speech Patterns",
-            """Use natural speech patterns including:
-            - "Ho ho ho!" when greeting or expressing joy
-            - "Let me check my list..." when searching
-            - "Oh my!" when surprised
-            - "Wonderful choice!" when they select something
-            - "The elves will love making this!" when confirming
-
-            Add natural pauses with filler words like "hmm", "let's see", "ah yes" to sound more natural."""
-        )
+        self.prompt_add_section("Speech Patterns", _SPEECH_PROMPT)
 
         # Available Tools section - CRITICAL for the AI to use functions
-        self.prompt_add_section(
-            "Available Tools",
-            """You have access to these magical tools to help children:
-
-            1. search_gifts - Use this when a child tells you what they want for Christmas.
-               This searches both Santa's workshop and Amazon's catalog.
-               Example: If a child says "I want Legos", use search_gifts with query="lego sets"
-
-            2. select_gift - Use this after presenting options to confirm which gift they chose.
-               This records their selection and shows it on the screen.
-
-            3. check_nice_list - Use this when a child asks if they're on the nice list or
-               when you want to check their behavior status. Always use their name.
-
-            IMPORTANT: You MUST use these tools during the conversation!
-            - When a child mentions what they want → use search_gifts
-            - After they pick from options → use select_gift
-            - When checking nice list → use check_nice_list"""
-        )
+        self.prompt_add_section("Available Tools", _TOOLS_PROMPT)
 
     def _setup_functions(self):
         """Set up SWAIG functions for gift selection"""
@@ -121,13 +438,16 @@ class SantaAIAgent(AgentBase):
         def get_gift_state(raw_data):
             """Get current gift state from global data"""
             global_data = raw_data.get('global_data', {})
-            default_state = {
-                'gift_search_results': [],
-                'selected_gift': None,
-                'search_query': '',
-                'state': 'greeting'
-            }
-            return global_data.get('gift_state', default_state), global_data
+            gift_state = global_data.get('gift_state')
+            if gift_state is None:
+                # First turn - only build the default state when there is none yet
+                gift_state = {
+                    'gift_search_results': [],
+                    'selected_gift': None,
+                    'search_query': '',
+                    'state': 'greeting'
+                }
+            return gift_state, global_data
 
         def save_gift_state(result, gift_state, global_data):
             """Save gift state to global data (following holyguacamole pattern)"""
@@ -138,26 +458,21 @@ class SantaAIAgent(AgentBase):
         @self.tool(
             name="search_gifts",
             description="Search for gift ideas based on what the child wants",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "What to search for (e.g., 'lego sets', 'dolls', 'video games for kids')"
-                    },
-                    "child_age": {
-                        "type": "integer",
-                        "description": "Approximate age of the child (optional)",
-                        "minimum": 3,
-                        "maximum": 16
-                    }
-                },
-                "required": ["query"]
-            }
+            parameters=_SEARCH_GIFTS_SCHEMA
         )
         def search_gifts(args, raw_data):
             """Search Amazon for gift ideas using RapidAPI"""
             query = args.get('query')
+
+            # Search the main query plus any extra wishes, once each and at most MAX_SEARCH_QUERIES
+            queries, seen = [], set()
+            for q in [query, *(args.get('queries') or [])]:
+                key = q.strip().lower() if isinstance(q, str) else ''
+                if key and key not in seen:
+                    seen.add(key)
+                    queries.append(q.strip())
+            queries = queries[:MAX_SEARCH_QUERIES] or [query or '']
+            query = ", ".join(queries)
             child_age = args.get('child_age')
 
             # Send searching event immediately to reset UI
@@ -174,13 +489,17 @@ class SantaAIAgent(AgentBase):
             # The user will specify if they want kids items
 
             # Debug the search
-            print(f"DEBUG SWAIG: search_gifts called with query='{query}', age={child_age}")
+            logger.debug("search_gifts called with queries=%s, age=%s", queries, child_age)
 
-            # Call RapidAPI
-            products = self._search_amazon_products(query)
+            # Call RapidAPI, running multiple wishes concurrently so their latency overlaps
+            if len(queries) == 1:
+                products = self._search_amazon_products(queries[0])
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(queries), 4)) as pool:
+                    products = _merge_search_results(pool.map(self._search_amazon_products, queries))
 
             if not products:
-                print("DEBUG SWAIG: No products returned from search")
+                logger.debug("No products returned from search")
                 result = SwaigFunctionResult("Oh dear! I'm having trouble reaching my workshop catalog right now. Let me check again... Can you tell me more about what kind of gift you're looking for?")
 
                 # Update gift state
@@ -196,17 +515,13 @@ class SantaAIAgent(AgentBase):
                 })
 
                 # Debug dump the complete result
-                print("\n=== SWAIG RESULT DUMP (search_gifts - FAILED) ===")
-                print(f"Response Text: Search failed message")
-                print(f"Query: {query}")
-                print(f"Event Sent: search_failed")
-                print("=== END RESULT DUMP ===\n")
+                logger.debug("SWAIG result (search_gifts - FAILED): query='%s', event=search_failed", query)
 
                 return result
 
             # Store results in session
             gift_data = []
-            response_text = "Ho ho ho! I found some wonderful gifts that would be perfect! Let me tell you about each one:\n\n"
+            parts = ["Ho ho ho! I found some wonderful gifts that would be perfect! Let me tell you about each one:\n\n"]
 
             for i, product in enumerate(products[:4], 1):
                 # Build gift data for frontend
@@ -216,30 +531,30 @@ class SantaAIAgent(AgentBase):
                     'price': product.get('price', 'Price upon request'),
                     'image': product.get('image', ''),
                     'url': product.get('url', ''),
-                    'description': product.get('description', '')[:200] if product.get('description') else f"{product.get('title', 'Gift')} - Perfect for children!",
+                    # Descriptions are already capped at 200 chars when the product is built
+                    'description': product.get('description') or f"{product.get('title', 'Gift')} - Perfect for children!",
                     'rating': product.get('rating', ''),
                     'asin': product.get('asin', '')
                 }
                 gift_data.append(gift_item)
 
                 # Build detailed response for the LLM to speak about each product
-                response_text += f"Option {i}: {gift_item['title']}\n"
-                response_text += f"   Price: {gift_item['price']}\n"
-
-                if gift_item.get('rating'):
-                    response_text += f"   Rating: {gift_item['rating']} stars\n"
-
-                if gift_item.get('description'):
-                    response_text += f"   Description: {gift_item['description'][:100]}...\n"
-
-                response_text += "\n"
-
-            response_text += "I can see all these wonderful gifts on my magical display here at the North Pole! "
-            response_text += "Which one would you like? Just tell me the number - option 1, 2, 3, or 4!"
-
-            print(f"DEBUG SWAIG: Found {len(gift_data)} gifts, sending to frontend")
-            print(f"DEBUG SWAIG: Gift data being sent: {[g['title'] for g in gift_data]}")
-            print(f"DEBUG SWAIG: Full response text for LLM:\n{response_text}")
+                rating = gift_item.get('rating')
+                description = gift_item.get('description')
+                parts.append(_OPTION_TMPL.format_map({
+                    'i': i,
+                    'title': gift_item['title'],
+                    'price': gift_item['price'],
+                    'rating_line': f"   Rating: {rating} stars\n" if rating else "",
+                    'desc_line': f"   Description: {description[:100]}...\n" if description else ""
+                }))
+
+            parts.append("I can see all these wonderful gifts on my magical display here at the North Pole! ")
+            parts.append("Which one would you like? Just tell me the number - option 1, 2, 3, or 4!")
+            response_text = "".join(parts)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Found %d gifts, sending to frontend: %s", len(gift_data), [g['title'] for g in gift_data])
 
             # Create the result with the detailed response text for the LLM
             result = SwaigFunctionResult(response_text)
@@ -254,80 +569,65 @@ class SantaAIAgent(AgentBase):
             result.swml_change_step("presenting_options")
 
             # Send to frontend using swml_user_event (Option A)
-            print(f"DEBUG SWAIG: Sending user_event with {len(gift_data)} gifts to UI")
+            logger.debug("Sending user_event with %d gifts to UI", len(gift_data))
             result.swml_user_event({
                 'type': 'gifts_found',  # Changed from 'event_type' to match holyguacamole
                 'gifts': gift_data,
                 'query': query
             })
 
-            print("DEBUG SWAIG: COMPLETE DATA BEING RETURNED TO LLM:")
-            print(f"  - Response text length: {len(response_text)} chars")
-            print(f"  - Global data stored: gift_search_results with {len(gift_data)} items")
-            print(f"  - User event sent: gifts_found with product details")
-
             # Debug dump the complete result
-            print("\n=== SWAIG RESULT DUMP (search_gifts) ===")
-            print(f"Response Text:\n{response_text}")
-            print(f"Global Data: {gift_data}")
-            print("=== END RESULT DUMP ===\n")
+            logger.debug("SWAIG result (search_gifts):\nResponse Text:\n%s\nGlobal Data: %s", response_text, gift_data)
 
             return result
 
         @self.tool(
             name="select_gift",
             description="Select a specific gift from the search results",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "gift_choice": {
-                        "type": "integer",
-                        "description": "The option number (1, 2, 3, or 4)",
-                        "minimum": 1,
-                        "maximum": 4
-                    }
-                },
-                "required": ["gift_choice"]
-            }
+            parameters=_SELECT_GIFT_SCHEMA
         )
         def select_gift(args, raw_data):
             """Confirm the child's gift selection"""
             choice = args.get('gift_choice')
 
-            print(f"DEBUG SWAIG: select_gift called with choice={choice}")
+            logger.debug("select_gift called with choice=%s", choice)
 
             # Get current state
             gift_state, global_data = get_gift_state(raw_data)
             gift_results = gift_state.get('gift_search_results', [])
 
-            print(f"DEBUG SWAIG: Available gifts in session: {[g.get('title', 'Unknown') for g in gift_results]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Available gifts in session: %s", [g.get('title', 'Unknown') for g in gift_results])
 
             if not gift_results:
-                print("DEBUG SWAIG: No gift results in session")
+                logger.debug("No gift results in session")
                 return SwaigFunctionResult("Oh my! I need to search for gifts first. What kind of gift would you like for Christmas?")
 
             if choice > len(gift_results) or choice < 1:
-                print(f"DEBUG SWAIG: Invalid choice {choice}, valid range is 1-{len(gift_results)}")
+                logger.debug("Invalid choice %s, valid range is 1-%d", choice, len(gift_results))
                 return SwaigFunctionResult(f"Oh my! I don't see option {choice}. Please choose from options 1 to {len(gift_results)}. Which one would you like?")
 
             selected_gift = gift_results[choice - 1]
 
-            print(f"DEBUG SWAIG: Gift selected: {selected_gift['title']} at {selected_gift.get('price', 'N/A')}")
+            logger.debug("Gift selected: %s at %s", selected_gift['title'], selected_gift.get('price', 'N/A'))
 
             # Provide complete details for the LLM to speak about the selection
-            response_text = f"Ho ho ho! What a wonderful choice! You've selected:\n\n"
-            response_text += f"**{selected_gift['title']}**\n"
-            response_text += f"Price: {selected_gift.get('price', 'Check listing')}\n"
+            parts = [
+                "Ho ho ho! What a wonderful choice! You've selected:\n\n",
+                f"**{selected_gift['title']}**\n",
+                f"Price: {selected_gift.get('price', 'Check listing')}\n"
+            ]
 
             if selected_gift.get('rating'):
-                response_text += f"Rating: {selected_gift['rating']} stars - Other children love this!\n"
+                parts.append(f"Rating: {selected_gift['rating']} stars - Other children love this!\n")
 
             if selected_gift.get('description'):
-                response_text += f"\nThis gift is perfect because: {selected_gift['description'][:150]}\n"
+                parts.append(f"\nThis gift is perfect because: {selected_gift['description'][:150]}\n")
 
-            response_text += "\nThe elves are already preparing this special gift for you! "
-            response_text += "I can see it appearing on my list right now. "
-            response_text += "\nWould you like to search for anything else from Santa's workshop?"
+            parts.append("\nThe elves are already preparing this special gift for you! ")
+            parts.append("I can see it appearing on my list right now. ")
+            parts.append("\nWould you like to search for anything else from Santa's workshop?")
+            response_text = "".join(parts)
 
             result = SwaigFunctionResult(response_text)
 
@@ -341,53 +641,34 @@ class SantaAIAgent(AgentBase):
             result.swml_change_step("gift_confirmed")
 
             # Send to frontend using swml_user_event (Option A)
-            print(f"DEBUG SWAIG: Sending gift_selected event to UI with gift id={choice}")
+            logger.debug("Sending gift_selected event to UI with gift id=%s", choice)
             result.swml_user_event({
                 'type': 'gift_selected',  # Changed from 'event_type' to match holyguacamole
                 'gift': selected_gift
             })
 
             # Debug dump the complete result
-            print("\n=== SWAIG RESULT DUMP (select_gift) ===")
-            print(f"Response Text:\n{response_text}")
-            print(f"Selected Gift: {selected_gift}")
-            print(f"Session Data Stored: selected_gift, state='gift_confirmed'")
-            print("=== END RESULT DUMP ===\n")
+            logger.debug("SWAIG result (select_gift):\nResponse Text:\n%s\nSelected Gift: %s", response_text, selected_gift)
 
             return result
 
         @self.tool(
             name="check_nice_list",
             description="Check if a child is on the nice list",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "The child's name"
-                    }
-                },
-                "required": ["name"]
-            }
+            parameters=_CHECK_NICE_LIST_SCHEMA
         )
         def check_nice_list(args, raw_data):
             """Fun function to check if child is on the nice list"""
             name = args.get('name', 'dear child')
 
-            print(f"DEBUG SWAIG: Checking nice list for: {name}")
+            logger.debug("Checking nice list for: %s", name)
 
             # Get current state
             gift_state, global_data = get_gift_state(raw_data)
 
             # Always positive and encouraging!
-            responses = [
-                f"Let me check my big magical book here at the North Pole... *pages rustling*... Oh yes! I found it! {name} is definitely on the NICE LIST! You've been wonderful this year!",
-                f"Ho ho ho! {name}! Let me see... *checking list twice*... YES! You're on my nice list! I can see all the kind things you've done this year!",
-                f"My special list says {name} has been absolutely wonderful! The elves have been telling me such good things about you! Keep up the fantastic work!",
-                f"The elves are so excited! They just told me that {name} is on the nice list! They've been watching and you've been so good!"
-            ]
-
-            response_text = random.choice(responses)
+            template = _NICE_TEMPLATES[random.randrange(len(_NICE_TEMPLATES))]
+            response_text = template.format(name=name)
             response_text += f"\n\n✨ {name} - NICE LIST STATUS: CONFIRMED! ✨"
             response_text += "\n\nYou're going to have a magical Christmas!"
 
@@ -406,185 +687,102 @@ class SantaAIAgent(AgentBase):
             })
 
             # Debug dump the complete result
-            print("\n=== SWAIG RESULT DUMP (check_nice_list) ===")
-            print(f"Response Text:\n{response_text}")
-            print(f"Name Checked: {name}")
-            print(f"Event Sent: nice_list_checked")
-            print("=== END RESULT DUMP ===\n")
+            logger.debug("SWAIG result (check_nice_list):\nResponse Text:\n%s\nName Checked: %s", response_text, name)
 
             return result
 
     def _search_amazon_products(self, query: str) -> List[Dict]:
         """Search Amazon products using RapidAPI"""
 
+        if self._offline_demo:
+            return self._get_mock_products(query)
+
         if not self.rapidapi_key:
-            print("Warning: RapidAPI key not configured")
+            logger.warning("RapidAPI key not configured")
             return self._get_mock_products(query)
 
-        url = 'https://real-time-amazon-data.p.rapidapi.com/search'
+        cache_key = query.strip().lower()
+        with self._cache_lock:
+            cached = self._search_cache.get(cache_key)
+            if cached and cached[0] > time.monotonic():
+                logger.debug("Cache hit for query '%s'", cache_key)
+                return [dict(product) for product in cached[1]]
 
-        # Use lowercase headers with x- prefix as shown in the curl example
-        headers = {
-            'x-rapidapi-host': 'real-time-amazon-data.p.rapidapi.com',
-            'x-rapidapi-key': self.rapidapi_key
-        }
-
-        # Match the exact query parameters from the curl example
-        params = {
-            'query': query,
-            'page': '1',
-            'country': 'US',
-            'sort_by': 'RELEVANCE',
-            'product_condition': 'ALL',
-            'is_prime': 'false',
-            'deals_and_discounts': 'NONE'
-        }
+        params = {**self._rapidapi_base_params, 'query': query}
+        http = self._get_http()
 
         try:
-            print(f"DEBUG: RapidAPI Search Query: '{query}'")
-            print(f"DEBUG: Request URL: {url}")
-            print(f"DEBUG: Request params: {params}")
-
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-
-            print(f"DEBUG: RapidAPI Response Status: {response.status_code}")
-
-            if response.status_code == 200:
-                data = response.json()
-                products = []
-
-                # Debug: Print the structure of the response
-                print(f"DEBUG: Response keys: {data.keys()}")
-
-                # The API returns data in data.products array
-                product_list = data.get('data', {}).get('products', [])
-
-                print(f"DEBUG: Found {len(product_list)} products from Amazon")
-
-                # Debug: Print first product structure if available
-                if product_list:
-                    print(f"DEBUG: First product keys: {product_list[0].keys()}")
-
-                for item in product_list[:10]:  # Check more items to find suitable ones
-                    # Extract product details
-                    title = item.get('product_title', '')
-                    price_str = item.get('product_price', '')
-                    image = item.get('product_photo', '')
-                    url = item.get('product_url', '')
-                    asin = item.get('asin', '')
-                    rating = item.get('product_star_rating', '')
-
-                    # Skip if no title or image
-                    if not title or not image:
-                        continue
-
-                    # Try to extract numeric price for filtering
-                    try:
-                        if price_str and '$' in price_str:
-                            # Extract price (e.g., "$29.99" -> 29.99)
-                            price_num = float(price_str.replace('$', '').replace(',', '').split()[0])
-
-                            # Skip if outside price range
-                            if price_num < self.min_price or price_num > self.max_price:
-                                continue
-                    except:
-                        # Include items even if we can't parse the price
-                        pass
-
-                    product_data = {
-                        'title': title,
-                        'price': price_str or 'Price not available',
-                        'image': image,
-                        'url': url or f'https://www.amazon.com/dp/{asin}' if asin else '#',
-                        'description': item.get('product_description', '')[:200] if item.get('product_description') else f"{title} - Great gift for kids!",
-                        'rating': rating,
-                        'asin': asin
-                    }
-
-                    products.append(product_data)
-
-                    # Debug log the product being added
-                    print(f"DEBUG: Added product #{len(products)}: {title[:50]}... Price: {price_str}, Has Image: {bool(image)}")
-
-                    # Stop when we have 3 suitable products
-                    if len(products) >= 3:
-                        break
-
-                print(f"DEBUG: Returning {len(products)} products after filtering")
-
-                # Debug log the final products
-                for i, prod in enumerate(products, 1):
-                    print(f"DEBUG: Product {i}: {prod['title'][:50]}... | ${prod['price']} | Image: {bool(prod['image'])}")
-
-                return products[:3]
-            else:
-                print(f"RapidAPI Error Response: {response.text}")
+            logger.debug("RapidAPI search query='%s' params=%s", query, params)
+
+            with http.get(self._rapidapi_url, headers=self._rapidapi_headers, params=params,
+                                timeout=10, stream=True) as response:
+                logger.debug("RapidAPI response status: %d", response.status_code)
+
+                if response.status_code != 200:
+                    # Only the start of the body is logged so error pages are capped too
+                    snippet = next(response.iter_content(chunk_size=512), b'')
+                    logger.error("RapidAPI error response (%d): %s", response.status_code,
+                                 snippet.decode('utf-8', 'replace'))
+                    return self._get_mock_products(query)
 
-        except requests.exceptions.RequestException as e:
-            print(f"Request error searching Amazon: {e}")
+                # Read the body in chunks and refuse oversized payloads before decoding
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=16384):
+                    body.extend(chunk)
+                    if len(body) > MAX_SEARCH_RESPONSE_BYTES:
+                        raise ValueError(f"response larger than {MAX_SEARCH_RESPONSE_BYTES} bytes")
+
+            data = orjson.loads(body)
+
+            # The API returns data in data.products array
+            product_list = data.get('data', {}).get('products', [])
+
+            logger.debug("Found %d products from Amazon", len(product_list))
+
+            # Check more items to find suitable ones, stopping at 3
+            products = list(islice(_iter_filtered(product_list[:10], self.min_price, self.max_price), 3))
+
+            logger.debug("Returning %d products after filtering", len(products))
+
+            # Empty results may be a transient upstream hiccup, so only real hits are cached
+            if products:
+                self._cache_search_results(cache_key, products)
+            return [dict(product) for product in products]
+
+        except self._http_error as e:
+            logger.error("Request error searching Amazon: %s", e)
         except Exception as e:
-            print(f"Error parsing Amazon response: {e}")
+            logger.error("Error parsing Amazon response: %s", e)
 
         # Return mock data if API fails
         return self._get_mock_products(query)
 
+    def _get_http(self):
+        """Return the RapidAPI session, creating it (and binding its error class) on first use."""
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    import requests
+
+                    self._http_error = requests.RequestException
+                    self._http = pooled_session()
+        return self._http
+
+    def _cache_search_results(self, cache_key: str, products: List[Dict]):
+        """Store search results in the TTL cache, evicting the oldest entry when full"""
+        with self._cache_lock:
+            if cache_key not in self._search_cache and len(self._search_cache) >= SEARCH_CACHE_SIZE:
+                self._search_cache.pop(next(iter(self._search_cache)))
+            self._search_cache[cache_key] = (time.monotonic() + SEARCH_CACHE_TTL, products)
+
     def _get_mock_products(self, query: str) -> List[Dict]:
         """Return mock products for testing when API is unavailable"""
 
-        mock_products = {
-            "lego": [
-                {
-                    'title': 'LEGO Classic Creative Bricks Set',
-                    'price': '$29.99',
-                    'image': 'https://via.placeholder.com/300x300?text=LEGO+Set',
-                    'url': '#',
-                    'description': 'Build anything you can imagine with this classic LEGO set!'
-                },
-                {
-                    'title': 'LEGO City Police Station',
-                    'price': '$79.99',
-                    'image': 'https://via.placeholder.com/300x300?text=Police+Station',
-                    'url': '#',
-                    'description': 'Complete police station with vehicles and minifigures'
-                },
-                {
-                    'title': 'LEGO Friends Heartlake City',
-                    'price': '$49.99',
-                    'image': 'https://via.placeholder.com/300x300?text=LEGO+Friends',
-                    'url': '#',
-                    'description': 'Build and play in Heartlake City with friends'
-                }
-            ],
-            "doll": [
-                {
-                    'title': 'American Girl Doll - Holiday Edition',
-                    'price': '$98.00',
-                    'image': 'https://via.placeholder.com/300x300?text=American+Girl',
-                    'url': '#',
-                    'description': 'Beautiful holiday-themed American Girl doll'
-                },
-                {
-                    'title': 'Barbie Dreamhouse Playset',
-                    'price': '$89.99',
-                    'image': 'https://via.placeholder.com/300x300?text=Barbie+Dreamhouse',
-                    'url': '#',
-                    'description': 'Three-story Barbie dreamhouse with elevator'
-                },
-                {
-                    'title': 'Baby Alive Doll',
-                    'price': '$34.99',
-                    'image': 'https://via.placeholder.com/300x300?text=Baby+Alive',
-                    'url': '#',
-                    'description': 'Interactive baby doll that eats, drinks, and more'
-                }
-            ]
-        }
-
         # Return relevant mock products based on query
         query_lower = query.lower()
-        for key, products in mock_products.items():
+        for key, products in _MOCK_PRODUCTS.items():
             if key in query_lower:
-                return products
+                return list(products)
 
         # Default mock products
         return [
@@ -612,7 +810,7 @@ class SantaAIAgent(AgentBase):
             # Add background music for festive atmosphere
             self.set_param("background_file", f"{base_url}/background.mp3")
             self.set_param("background_file_volume", -10)
-            print(f"Set video URLs to use host: {base_url}")
+            logger.debug("Set video URLs to use host: %s", base_url)
 
         # Configure Santa voice as part of language settings (like holyguacamole)
         voice_id = 'uDsPstFWFBUXjIBimV7s'  # Santa voice from SignalWire guide
@@ -628,16 +826,8 @@ class SantaAIAgent(AgentBase):
             self.set_post_prompt("Summarize the conversation, including all the gifts discussed, the child's preferences, their selected gift if any, and any special mentions about their Christmas wishes.")
             self.set_post_prompt_url(post_prompt_url)
 
-        # Add speech hints for better recognition of holiday terms
-        self.add_hints([
-            "toy", "toys", "game", "games", "doll", "dolls",
-            "lego", "puzzle", "bicycle", "bike", "scooter",
-            "christmas", "present", "gift", "santa", "elves",
-            "nice", "naughty", "list", "workshop", "north pole",
-            "yes", "no", "please", "thank you",
-            "option one", "option two", "option three",
-            "first", "second", "third"
-        ])
+        # Add speech hints (the SDK only accepts a list here)
+        self.add_hints(list(self._SPEECH_HINTS))
 
         # Call parent implementation to handle the SWML request
         return super().on_swml_request(request_data, callback_path, request)
@@ -655,6 +845,31 @@ def get_signalwire_host():
     return f"{space}.signalwire.com"
 
 
+# SignalWire settings are fixed for the life of the process, so resolve them once
+_SW_HOST = get_signalwire_host()
+_SW_PROJECT = os.getenv("SIGNALWIRE_PROJECT_ID", "")
+_SW_TOKEN = os.getenv("SIGNALWIRE_TOKEN", "")
+_SW_AUTH = (_SW_PROJECT, _SW_TOKEN) if _SW_PROJECT and _SW_TOKEN else None
+# Credentials can't change without a restart, so they're checked once here
+_CREDS_OK = bool(_SW_HOST and _SW_AUTH)
+# Base URL for the fabric resources REST API
+_API_BASE = f"https://{_SW_HOST}/api/fabric/resources"
+
+# Async HTTP/2 client for SignalWire calls made from request handlers, so they don't tie up a
+# threadpool worker for the whole round-trip (closed on app shutdown)
+ASYNC_SW = httpx.AsyncClient(
+    base_url=f"https://{_SW_HOST}",
+    auth=_SW_AUTH,
+    headers={"Accept": "application/json"},
+    timeout=10.0,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_keepalive_connections=20)
+    )
+) if _CREDS_OK else None
+
+
 def find_resource_address(addresses, agent_name):
     """
     Find the resource address matching /public/{agent_name} from a list of addresses.
@@ -680,68 +895,123 @@ def find_resource_address(addresses, agent_name):
     return addresses[0] if addresses else None
 
 
-def find_existing_handler(sw_host, auth, agent_name):
-    """Find an existing SWML handler by name."""
+def list_swml_handlers(auth):
+    """List external SWML handlers, serving from cache within the TTL."""
+    if _handlers_cache["handlers"] is not None and time.time() - _handlers_cache["ts"] < HANDLER_CACHE_TTL:
+        return _handlers_cache["handlers"]
+
+    headers = {"If-None-Match": _handlers_cache["etag"]} if _handlers_cache["etag"] else None
+
+    # Ask for the largest page so the lookup never misses a handler past the first page
+    resp = get_sw_session().get(
+        f"{_API_BASE}/external_swml_handlers",
+        params={"page_size": HANDLER_PAGE_SIZE},
+        auth=auth,
+        headers=headers,
+        timeout=SW_REQUEST_TIMEOUT
+    )
+    if resp.status_code == 304 and _handlers_cache["handlers"] is not None:
+        _handlers_cache["ts"] = time.time()
+        return _handlers_cache["handlers"]
+    if resp.status_code != 200:
+        logger.error("Failed to list handlers: %s", resp.status_code)
+        return None
+
+    _handlers_cache["handlers"] = resp.json().get("data", [])
+    _handlers_cache["etag"] = resp.headers.get("ETag")
+    _handlers_cache["ts"] = time.time()
+    return _handlers_cache["handlers"]
+
+
+def invalidate_handler_cache():
+    """Force the next handler listing to revalidate with SignalWire."""
+    _handlers_cache["ts"] = 0
+
+
+def find_handler(auth, agent_name):
+    """Find an existing SWML handler record by name (without its address)."""
+    handlers = list_swml_handlers(auth)
+    if handlers is None:
+        return None
+
+    for handler in handlers:
+        # The name is nested in swml_webhook object
+        swml_webhook = handler.get("swml_webhook", {})
+        handler_name = swml_webhook.get("name") or handler.get("display_name")
+
+        # Check if this handler matches our agent name
+        if handler_name == agent_name:
+            return {
+                "id": handler.get("id"),
+                "name": handler_name,
+                "url": swml_webhook.get("primary_request_url", "")
+            }
+    return None
+
+
+def fetch_resource_address(auth, handler_id, agent_name):
+    """Get the /public/{agent_name} resource address for a handler."""
+    addr_resp = get_sw_session().get(
+        f"{_API_BASE}/external_swml_handlers/{handler_id}/addresses",
+        auth=auth,
+        timeout=SW_REQUEST_TIMEOUT
+    )
+    addr_resp.raise_for_status()
+    addresses = addr_resp.json().get("data", [])
+    return find_resource_address(addresses, agent_name)
+
+
+def update_handler_url(auth, handler_id, swml_url):
+    """Point an existing SWML handler at our SWML URL."""
+    update_resp = get_sw_session().put(
+        f"{_API_BASE}/external_swml_handlers/{handler_id}",
+        json={
+            "primary_request_url": swml_url,
+            "primary_request_method": "POST"
+        },
+        auth=auth,
+        timeout=SW_REQUEST_TIMEOUT
+    )
+    update_resp.raise_for_status()
+
+
+def find_existing_handler(auth, agent_name):
+    """Find an existing SWML handler by name, including its resource address."""
     try:
-        # List all external SWML handlers
-        resp = requests.get(
-            f"https://{sw_host}/api/fabric/resources/external_swml_handlers",
-            auth=auth,
-            headers={"Accept": "application/json"}
-        )
-        if resp.status_code != 200:
-            print(f"Failed to list handlers: {resp.status_code}")
-            return None
-
-        handlers = resp.json().get("data", [])
-
-        for handler in handlers:
-            # The name is nested in swml_webhook object
-            swml_webhook = handler.get("swml_webhook", {})
-            handler_name = swml_webhook.get("name") or handler.get("display_name")
-
-            # Check if this handler matches our agent name
-            if handler_name == agent_name:
-                handler_id = handler.get("id")
-                handler_url = swml_webhook.get("primary_request_url", "")
-                # Get the address for this handler
-                addr_resp = requests.get(
-                    f"https://{sw_host}/api/fabric/resources/external_swml_handlers/{handler_id}/addresses",
-                    auth=auth,
-                    headers={"Accept": "application/json"}
-                )
-                if addr_resp.status_code == 200:
-                    addresses = addr_resp.json().get("data", [])
-                    resource_addr = find_resource_address(addresses, agent_name)
-                    if resource_addr:
-                        return {
-                            "id": handler_id,
-                            "name": handler_name,
-                            "url": handler_url,
-                            "address_id": resource_addr["id"],
-                            "address": resource_addr["channels"]["audio"]
-                        }
-    except Exception as e:
-        print(f"Error checking existing handlers: {e}")
+        handler = find_handler(auth, agent_name)
+        if handler:
+            resource_addr = fetch_resource_address(auth, handler["id"], agent_name)
+            if resource_addr:
+                return {
+                    **handler,
+                    "address_id": resource_addr["id"],
+                    "address": resource_addr["channels"]["audio"]
+                }
+    except Exception:
+        logger.exception("Error checking existing handlers")
     return None
 
 
+def store_handler_info(**fields):
+    """Update swml_handler_info atomically from the setup thread."""
+    with _handler_info_lock:
+        swml_handler_info.update(fields)
+
+
 def setup_swml_handler():
     """Set up SWML handler on startup."""
-    sw_host = get_signalwire_host()
-    project = os.getenv("SIGNALWIRE_PROJECT_ID", "")
-    token = os.getenv("SIGNALWIRE_TOKEN", "")
+    auth = _SW_AUTH
     agent_name = os.getenv("AGENT_NAME", "santa")
     proxy_url = os.getenv("SWML_PROXY_URL_BASE", os.getenv("APP_URL", ""))
     auth_user = os.getenv("SWML_BASIC_AUTH_USER", "signalwire")
     auth_pass = os.getenv("SWML_BASIC_AUTH_PASSWORD", "")
 
-    if not all([sw_host, project, token]):
-        print("SignalWire credentials not configured - skipping SWML handler setup")
+    if not _CREDS_OK:
+        logger.warning("SignalWire credentials not configured - skipping SWML handler setup")
         return
 
     if not proxy_url:
-        print("SWML_PROXY_URL_BASE/APP_URL not set - skipping SWML handler setup")
+        logger.warning("SWML_PROXY_URL_BASE/APP_URL not set - skipping SWML handler setup")
         return
 
     # Build SWML URL with basic auth credentials
@@ -751,39 +1021,112 @@ def setup_swml_handler():
     else:
         swml_url = proxy_url + "/santa"
 
-    auth = (project, token)
-    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    if fcntl is None:
+        register_swml_handler(auth, agent_name, swml_url)
+        return
+
+    # Only one worker at a time sets up the handler; the others reuse its result.
+    # The fingerprint ties shared state to this exact configuration. It is keyed with the API
+    # token so the password in swml_url can't be brute-forced from the file.
+    fingerprint = hmac.new(
+        _SW_TOKEN.encode(), f"{_SW_HOST}|{agent_name}|{swml_url}".encode(), hashlib.sha256
+    ).hexdigest()
+    try:
+        ensure_private_dir(SWML_SETUP_DIR)
+        lock_fd = os.open(SWML_SETUP_LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError as e:
+        logger.warning("Can't coordinate SWML setup across workers (%s) - setting up directly", e)
+        register_swml_handler(auth, agent_name, swml_url)
+        return
+
+    with os.fdopen(lock_fd, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        shared = read_shared_handler_info(fingerprint)
+        if shared:
+            store_handler_info(**shared)
+            logger.info("Using SWML handler set up by another worker - call address: %s", shared["address"])
+            return
+
+        register_swml_handler(auth, agent_name, swml_url)
+
+        if swml_handler_info["address_id"]:
+            write_shared_handler_info(fingerprint)
+
+
+def ensure_private_dir(path):
+    """Create path as a directory only we can access, refusing one someone else planted."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError(f"{path} is not a private directory")
+
 
+def read_shared_handler_info(fingerprint):
+    """Load handler info another worker recorded for the same configuration, if still fresh."""
+    try:
+        with open(SWML_SETUP_STATE_FILE) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("fingerprint") != fingerprint or time.time() - state.get("ts", 0) > SWML_SETUP_STATE_TTL:
+        return None
+    return {"id": state["id"], "address_id": state["address_id"], "address": state["address"]}
+
+
+def write_shared_handler_info(fingerprint):
+    """Record this worker's handler info for other workers (atomic replace)."""
+    state = {"fingerprint": fingerprint, "ts": time.time(), **swml_handler_info}
+    tmp_path = f"{SWML_SETUP_STATE_FILE}.{os.getpid()}"
+    try:
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, SWML_SETUP_STATE_FILE)
+    except OSError as e:
+        logger.warning("Failed to share SWML handler info: %s", e)
+
+
+def register_swml_handler(auth, agent_name, swml_url):
+    """Find or create the agent's SWML handler and record its address."""
     # Look for an existing handler by name
-    existing = find_existing_handler(sw_host, auth, agent_name)
+    try:
+        existing = find_handler(auth, agent_name)
+    except Exception:
+        logger.exception("Error checking existing handlers")
+        existing = None
+
     if existing:
-        swml_handler_info["id"] = existing["id"]
-        swml_handler_info["address_id"] = existing["address_id"]
-        swml_handler_info["address"] = existing["address"]
+        store_handler_info(id=existing["id"])
 
         # Always update the URL to ensure credentials are current
-        # (API may return masked URLs making comparison unreliable)
+        # (API may return masked URLs making comparison unreliable).
+        # The update and the address lookup are independent, so run them concurrently.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            update_future = pool.submit(update_handler_url, auth, existing["id"], swml_url)
+            address_future = pool.submit(fetch_resource_address, auth, existing["id"], agent_name)
+
         try:
-            update_resp = requests.put(
-                f"https://{sw_host}/api/fabric/resources/external_swml_handlers/{existing['id']}",
-                json={
-                    "primary_request_url": swml_url,
-                    "primary_request_method": "POST"
-                },
-                auth=auth,
-                headers=headers
-            )
-            update_resp.raise_for_status()
-            print(f"Updated SWML handler: {existing['name']}")
+            update_future.result()
+            logger.info("Updated SWML handler: %s", existing["name"])
         except Exception as e:
-            print(f"Failed to update handler URL: {e}")
+            logger.error("Failed to update handler URL: %s", e)
 
-        print(f"Call address: {existing['address']}")
+        try:
+            resource_addr = address_future.result()
+        except Exception as e:
+            logger.error("Failed to get handler address: %s", e)
+            resource_addr = None
+
+        if resource_addr:
+            store_handler_info(address_id=resource_addr["id"], address=resource_addr["channels"]["audio"])
+            logger.info("Call address: %s", swml_handler_info["address"])
+        else:
+            logger.warning("No address found for handler")
     else:
         # Create a new external SWML handler with the agent name
         try:
-            handler_resp = requests.post(
-                f"https://{sw_host}/api/fabric/resources/external_swml_handlers",
+            handler_resp = get_sw_session().post(
+                f"{_API_BASE}/external_swml_handlers",
                 json={
                     "name": agent_name,
                     "used_for": "calling",
@@ -791,120 +1134,273 @@ def setup_swml_handler():
                     "primary_request_method": "POST"
                 },
                 auth=auth,
-                headers=headers
+                timeout=SW_REQUEST_TIMEOUT
             )
             handler_resp.raise_for_status()
             handler_id = handler_resp.json().get("id")
-            swml_handler_info["id"] = handler_id
+            store_handler_info(id=handler_id)
+            invalidate_handler_cache()
 
             # Get the address for this handler
-            addr_resp = requests.get(
-                f"https://{sw_host}/api/fabric/resources/external_swml_handlers/{handler_id}/addresses",
-                auth=auth,
-                headers={"Accept": "application/json"}
-            )
-            addr_resp.raise_for_status()
-            addresses = addr_resp.json().get("data", [])
-            resource_addr = find_resource_address(addresses, agent_name)
+            resource_addr = fetch_resource_address(auth, handler_id, agent_name)
             if resource_addr:
-                swml_handler_info["address_id"] = resource_addr["id"]
-                swml_handler_info["address"] = resource_addr["channels"]["audio"]
-                print(f"Created SWML handler: {agent_name}")
-                print(f"Call address: {swml_handler_info['address']}")
+                store_handler_info(address_id=resource_addr["id"], address=resource_addr["channels"]["audio"])
+                logger.info("Created SWML handler: %s", agent_name)
+                logger.info("Call address: %s", swml_handler_info["address"])
             else:
-                print("No address found for handler")
+                logger.warning("No address found for handler")
         except Exception as e:
-            print(f"Failed to create SWML handler: {e}")
-            # Retry finding existing handler (another worker may have just created it)
-            import time
-            time.sleep(0.5)
-            existing = find_existing_handler(sw_host, auth, agent_name)
+            logger.error("Failed to create SWML handler: %s", e)
+            # Look again for an existing handler (another worker may have just created it).
+            # Transient API errors were already retried by the session.
+            invalidate_handler_cache()
+            existing = find_existing_handler(auth, agent_name)
             if existing:
-                swml_handler_info["id"] = existing["id"]
-                swml_handler_info["address_id"] = existing["address_id"]
-                swml_handler_info["address"] = existing["address"]
-                print(f"Found existing SWML handler after retry: {existing['name']}")
-                print(f"Call address: {existing['address']}")
+                store_handler_info(id=existing["id"], address_id=existing["address_id"], address=existing["address"])
+                logger.info("Found existing SWML handler after retry: %s", existing["name"])
+                logger.info("Call address: %s", existing["address"])
+
+
+async def get_guest_token(address_id):
+    """Return a guest token for an address, minting one only when the cache can't serve it."""
+    # Guest tokens are not caller-specific, so every web client shares the cached one
+    cached = _token_cache.get(address_id)
+    if cached and cached[1] - time.time() > TOKEN_MIN_REMAINING:
+        return cached[0]
+
+    # Holding the lock across the POST means concurrent misses issue a single token
+    async with _token_lock:
+        cached = _token_cache.get(address_id)
+        if cached and cached[1] - time.time() > TOKEN_MIN_REMAINING:
+            return cached[0]
+        return await issue_guest_token(address_id)
+
+
+async def issue_guest_token(address_id):
+    """Create a guest token for an address, cache it and schedule its refresh."""
+    expire_at = int(time.time()) + TOKEN_LIFETIME
+    allowed = _allowed_addresses.get(address_id)
+    if allowed is None:
+        allowed = _allowed_addresses[address_id] = [address_id]
+
+    # The body is encoded with orjson and sent as raw content, skipping httpx's stdlib json path
+    guest_req = ASYNC_SW.build_request(
+        "POST",
+        _GUEST_TOKENS_PATH,
+        content=orjson.dumps({
+            "allowed_addresses": allowed,
+            "expire_at": expire_at
+        }),
+        headers=_GUEST_TOKENS_HEADERS
+    )
+    guest_resp = await ASYNC_SW.send(guest_req)
+    guest_resp.raise_for_status()
+    guest_token = orjson.loads(guest_resp.content).get("token", "")
+    _token_cache[address_id] = (guest_token, expire_at)
+
+    # Re-issue shortly before expiry so requests keep hitting the cache
+    previous = _token_refreshers.pop(address_id, None)
+    if previous:
+        previous.cancel()
+    loop = asyncio.get_running_loop()
+    _token_refreshers[address_id] = loop.call_later(
+        max(expire_at - time.time() - TOKEN_REFRESH_MARGIN, 0),
+        start_token_refresh, address_id
+    )
+    return guest_token
+
+
+def start_token_refresh(address_id):
+    """Timer callback: run the refresh as a task that stays referenced until it finishes."""
+    task = asyncio.get_running_loop().create_task(refresh_guest_token(address_id))
+    _token_refresh_tasks.add(task)
+    task.add_done_callback(_token_refresh_tasks.discard)
+
+
+async def refresh_guest_token(address_id):
+    """Background re-issue of a cached guest token; failures fall back to on-request minting."""
+    try:
+        async with _token_lock:
+            await issue_guest_token(address_id)
+    except Exception:
+        logger.exception("Guest token refresh failed")
+
+
+def etag_response(body, media_type, headers=None):
+    """Build a reusable Response for a static body, tagged with a content ETag."""
+    etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+    return Response(body, media_type=media_type, headers={**(headers or {}), "ETag": etag})
+
+
+def etag_json_response(payload):
+    """Serialize a static JSON payload once into a Response tagged with a content ETag."""
+    return etag_response(orjson.dumps(payload), "application/json")
+
+
+def conditional_response(request, response):
+    """Return 304 Not Modified when the client already holds the response's ETag."""
+    etag = response.headers["etag"]
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return response
+
+
+def etag_matches(if_none_match, etag):
+    """Weak If-None-Match comparison: any listed tag (W/ prefix ignored) or '*' matches."""
+    if not if_none_match:
+        return False
+    strong = etag.removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == strong:
+            return True
+    return False
+
+
+# Static /get_token error bodies, built once and returned by reference
+_ERR_NO_CREDS = Response(
+    b'{"error":"SignalWire credentials not configured"}',
+    media_type="application/json", status_code=500
+)
+_ERR_NO_HANDLER = Response(
+    b'{"error":"SWML handler not configured - check startup logs"}',
+    media_type="application/json", status_code=500
+)
+
+
+class SantaServer(AgentServer):
+    """AgentServer that serves the web UI's small text assets from memory."""
+
+    def preload_static_files(self, directory):
+        """Read small text assets into memory once and serve them from their own routes.
+
+        The routes are registered before the SDK's startup catch-all, so they take priority;
+        everything else (images, media, large files) still goes through serve_static_files.
+        """
+        root = Path(directory).resolve()
+        for path in root.rglob("*"):
+            if (path.suffix not in STATIC_CACHE_SUFFIXES or not path.is_file()
+                    or path.stat().st_size > STATIC_CACHE_MAX_FILE_BYTES):
+                continue
+            response = etag_response(
+                path.read_bytes(),
+                mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+                {"Cache-Control": f"public, max-age={STATIC_CACHE_MAX_AGE}"}
+            )
+            url_path = "/" + path.relative_to(root).as_posix()
+            self.add_static_route(url_path, response)
+            if path.name == "index.html":
+                self.add_static_route(url_path[:-len("index.html")], response)
+
+    def add_static_route(self, url_path, response):
+        """Serve a preloaded Response at url_path, answering revalidations with 304."""
+        @self.app.get(url_path, include_in_schema=False)
+        async def static_file(request: Request):
+            return conditional_response(request, response)
 
 
 def create_server():
     """Create AgentServer with static file mounting and API endpoints."""
-    server = AgentServer(host=HOST, port=PORT)
+    server = SantaServer(host=HOST, port=PORT)
+    server.app.router.default_response_class = ORJSONResponse
     server.register(SantaAIAgent(), "/santa")
 
-    # Serve static files using SDK's built-in method
+    # Serve static files using SDK's built-in method, with small assets held in memory
     web_dir = Path(__file__).parent / "web"
     if web_dir.exists():
         server.serve_static_files(str(web_dir))
+        server.preload_static_files(str(web_dir))
 
     # Add /get_token endpoint for WebRTC calls
     @server.app.get('/get_token')
-    def get_token():
+    async def get_token():
         """Get a guest token for the web client to call the agent."""
-        sw_host = get_signalwire_host()
-        project = os.getenv("SIGNALWIRE_PROJECT_ID", "")
-        token = os.getenv("SIGNALWIRE_TOKEN", "")
-
-        if not all([sw_host, project, token]):
-            return JSONResponse({"error": "SignalWire credentials not configured"}, status_code=500)
+        if not _CREDS_OK:
+            return _ERR_NO_CREDS
 
         if not swml_handler_info["address_id"]:
-            return JSONResponse({"error": "SWML handler not configured - check startup logs"}, status_code=500)
-
-        auth = (project, token)
-        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+            return _ERR_NO_HANDLER
 
         try:
-            # Create a guest token with access to this address
-            expire_at = int(time.time()) + 3600 * 24  # 24 hours
-
-            guest_resp = requests.post(
-                f"https://{sw_host}/api/fabric/guests/tokens",
-                json={
-                    "allowed_addresses": [swml_handler_info["address_id"]],
-                    "expire_at": expire_at
-                },
-                auth=auth,
-                headers=headers
-            )
-            guest_resp.raise_for_status()
-            guest_token = guest_resp.json().get("token", "")
-
-            return {
-                "token": guest_token,
-                "address": swml_handler_info["address"]
-            }
-
-        except requests.exceptions.RequestException as e:
-            print(f"Token request failed: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
-            return JSONResponse({"error": str(e)}, status_code=500)
+            guest_token = await get_guest_token(swml_handler_info["address_id"])
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError covers a 2xx whose body isn't JSON (e.g. a proxy error page)
+            logger.error("Token request failed: %s", e)
+            if isinstance(e, httpx.HTTPStatusError):
+                logger.debug("Token error response: %s", e.response.text)
+            return ORJSONResponse({"error": str(e)}, status_code=500)
 
-    # Add /get_credentials endpoint for curl examples
-    @server.app.get('/get_credentials')
-    def get_credentials():
-        """Get basic auth credentials for the web UI."""
         return {
-            "user": os.getenv("SWML_BASIC_AUTH_USER", ""),
-            "password": os.getenv("SWML_BASIC_AUTH_PASSWORD", "")
+            "token": guest_token,
+            "address": swml_handler_info["address"]
         }
 
-    # Add /get_resource_info endpoint for dashboard links
-    @server.app.get('/get_resource_info')
-    def get_resource_info():
-        """Get SWML handler resource info for linking to SignalWire dashboard."""
-        sw_host = get_signalwire_host()
+    def resource_info(resource_id):
+        """SWML handler resource info for linking to SignalWire dashboard."""
         return {
             "space_name": os.getenv("SIGNALWIRE_SPACE_NAME", ""),
-            "resource_id": swml_handler_info["id"],
-            "dashboard_url": f"https://{sw_host}/neon/resources/{swml_handler_info['id']}/edit?t=addresses" if sw_host and swml_handler_info["id"] else None
+            "resource_id": resource_id,
+            "dashboard_url": f"https://{_SW_HOST}/neon/resources/{resource_id}/edit?t=addresses" if _SW_HOST and resource_id else None
         }
 
-    # Set up SWML handler on startup (runs once per worker, after app is ready)
+    # Static JSON bodies are serialized once and the same Response is returned every time
+    credentials = {
+        "user": os.getenv("SWML_BASIC_AUTH_USER", ""),
+        "password": os.getenv("SWML_BASIC_AUTH_PASSWORD", "")
+    }
+    credentials_response = etag_json_response(credentials)
+    resource_info_responses = {}
+
+    # Add /bootstrap endpoint returning token, credentials and resource info in one round trip
+    @server.app.get('/bootstrap')
+    async def bootstrap():
+        """Get everything /get_token, /get_credentials and /get_resource_info return, in one call."""
+        token_info = await get_token()
+        if isinstance(token_info, Response):
+            return token_info
+        return {**token_info, **credentials, **resource_info(swml_handler_info["id"])}
+
+    # Add /get_credentials endpoint for curl examples (superseded by /bootstrap)
+    @server.app.get('/get_credentials', deprecated=True)
+    def get_credentials(request: Request):
+        """Get basic auth credentials for the web UI."""
+        return conditional_response(request, credentials_response)
+
+    # Add /get_resource_info endpoint for dashboard links (superseded by /bootstrap)
+    @server.app.get('/get_resource_info', deprecated=True)
+    def get_resource_info(request: Request):
+        """Get SWML handler resource info for linking to SignalWire dashboard."""
+        # Keyed by handler id: the body only changes once background setup finds the handler
+        resource_id = swml_handler_info["id"]
+        response = resource_info_responses.get(resource_id)
+        if response is None:
+            response = etag_json_response(resource_info(resource_id))
+            resource_info_responses[resource_id] = response
+        return conditional_response(request, response)
+
+    # Set up SWML handler on startup (runs once per worker, after app is ready).
+    # The REST calls run on a background thread so the worker accepts traffic
+    # immediately; /get_token reports an error until address_id is populated.
     @server.app.on_event("startup")
     async def on_startup():
-        setup_swml_handler()
+        loop = asyncio.get_running_loop()
+
+        def setup_and_prefetch_token():
+            setup_swml_handler()
+            # Mint the first guest token now so the first page load is served from cache
+            if ASYNC_SW is not None and swml_handler_info["address_id"]:
+                asyncio.run_coroutine_threadsafe(refresh_guest_token(swml_handler_info["address_id"]), loop)
+
+        threading.Thread(target=setup_and_prefetch_token, name="swml-handler-setup", daemon=True).start()
+
+    @server.app.on_event("shutdown")
+    async def on_shutdown():
+        for handle in _token_refreshers.values():
+            handle.cancel()
+        for task in list(_token_refresh_tasks):
+            task.cancel()
+        if ASYNC_SW is not None:
+            await ASYNC_SW.aclose()
 
     return server
 